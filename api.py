@@ -0,0 +1,249 @@
+# api.py — JSON ingestion API for Expense Diary (FastAPI + httpx), reuses CNB TXT + Calendarific logic from expense_core
+#
+# Run:  uvicorn api:app --host 0.0.0.0 --port 8000
+# Expenses are kept in process memory (like st.session_state in app.py) – run ONE worker per store.
+
+import asyncio
+import math
+import os
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import date as dt_date
+from typing import List, Literal, Optional
+
+import httpx
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+
+from expense_core import (
+    cnb_txt_url, cnb_feed_ok, parse_rate_from_txt, header_date_iso,
+    CALENDARIFIC_URL, calendarific_params, filter_public_holidays, resolve_country_for_calendarific,
+)
+
+MAX_BATCH = 1000
+MAX_AMOUNT = 1e12
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+HTTP_TIMEOUT = httpx.Timeout(10.0)
+
+# ---------------------------
+# Shared outbound HTTP client (connection pool)
+# ---------------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.http = httpx.AsyncClient(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+    try:
+        yield
+    finally:
+        await app.state.http.aclose()
+
+app = FastAPI(title="Expense Diary API", lifespan=lifespan)
+
+@app.exception_handler(RequestValidationError)
+async def validation_error(request: Request, exc: RequestValidationError):
+    # Don't echo the rejected input back – Infinity/NaN can't be encoded as JSON
+    errors = [{k: v for k, v in err.items() if k != "input"} for err in exc.errors()]
+    return JSONResponse(status_code=422, content={"detail": jsonable_encoder(errors)})
+
+# ---------------------------
+# TTL cache (async counterpart of st.cache_data)
+# ---------------------------
+class _TTLCache:
+    """Caches lookups for `ttl` seconds (at most `maxsize` keys, oldest dropped first);
+    concurrent misses for one key share a single fetch."""
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._items = {}
+
+    async def get(self, key, factory):
+        now = time.monotonic()
+        hit = self._items.get(key)
+        if hit and hit[0] > now:
+            return await asyncio.shield(hit[1])
+        self._items.pop(key, None)
+        if len(self._items) >= self.maxsize:
+            self._items = {k: v for k, v in self._items.items() if v[0] > now}
+            # Still full of fresh entries – drop the oldest (dicts keep insertion order)
+            for k in list(self._items)[:len(self._items) - self.maxsize + 1]:
+                del self._items[k]
+        task = asyncio.ensure_future(factory())
+        self._items[key] = (now + self.ttl, task)
+        try:
+            result = await asyncio.shield(task)
+        except Exception:
+            self._evict(key, task)
+            raise
+        # Failed lookups are not pinned for the whole TTL
+        if result is None:
+            self._evict(key, task)
+        return result
+
+    def _evict(self, key, task):
+        if self._items.get(key, (None, None))[1] is task:
+            del self._items[key]
+
+_cnb_cache = _TTLCache(ttl=600)
+_holiday_cache = _TTLCache(ttl=3600)
+
+# ---------------------------
+# CNB TXT feed (async)
+# ---------------------------
+async def _get_text(url: str, params: Optional[dict] = None):
+    try:
+        r = await app.state.http.get(url, params=params)
+        return r if r.status_code == 200 else None
+    except Exception:
+        return None
+
+async def fetch_cnb_txt(date_str: Optional[str]):
+    async def _fetch():
+        r = await _get_text(cnb_txt_url(date_str))
+        # 200 with an empty/garbled body is an upstream failure, not "currency not listed"
+        return r.text if r is not None and cnb_feed_ok(r.text) else None
+    return await _cnb_cache.get(date_str, _fetch)
+
+class UnknownCurrency(ValueError):
+    """Currency code is not listed in a CNB feed that downloaded and parsed fine."""
+
+async def get_rate_for(code: str, d: dt_date):
+    """(CZK per 1 unit, rate date ISO); (None, None) when CNB could not be reached."""
+    if code == "CZK":
+        return 1.0, d.isoformat()
+    txt = await fetch_cnb_txt(d.strftime("%d.%m.%Y"))
+    fallback = d
+    if txt is None:
+        # Latest feed only stands in for a today/future feed that isn't out yet –
+        # API clients post past dates, where today's rate would be silently wrong
+        if d < dt_date.today():
+            return None, None
+        txt = await fetch_cnb_txt(None)
+        fallback = dt_date.today()
+        if txt is None:
+            return None, None
+    rate, qty, header_date = parse_rate_from_txt(txt, code)
+    if rate is None or not qty:
+        raise UnknownCurrency(code)
+    return rate/qty, header_date_iso(header_date, fallback)
+
+# ---------------------------
+# Calendarific (ENV key only)
+# ---------------------------
+def _country_code(country: str) -> Optional[str]:
+    """2-letter codes pass through; app.py labels map to CZ/SK; anything else gets no holidays."""
+    country = country.strip()
+    if len(country) == 2 and country.isalpha():
+        return country.upper()
+    if any(k in country for k in ("Česko", "Czech", "Slovensko", "Slovakia")):
+        return resolve_country_for_calendarific(country)
+    return None
+
+async def calendarific_holidays(country_code: str, d: dt_date) -> list:
+    api_key = os.getenv("CALENDARIFIC_API_KEY", "").strip()
+    if not api_key:
+        return []
+
+    async def _fetch():
+        r = await _get_text(CALENDARIFIC_URL, calendarific_params(api_key, country_code, d.year, d.month, d.day))
+        try:
+            return filter_public_holidays(r.json()) if r is not None else None
+        except Exception:
+            return None
+    return await _holiday_cache.get((country_code, d), _fetch) or []
+
+# ---------------------------
+# Models
+# ---------------------------
+class ExpenseIn(BaseModel):
+    date: dt_date
+    amount: float = Field(ge=0, le=MAX_AMOUNT, allow_inf_nan=False)
+    currency: str = Field(default="CZK", pattern=r"^[A-Za-z]{3}$")
+    country: str = ""
+    category: str = ""
+    shop: str = ""
+    note: str = ""
+
+class ExpenseBatchIn(BaseModel):
+    expenses: List[ExpenseIn] = Field(min_length=1, max_length=MAX_BATCH)
+
+# ---------------------------
+# In-memory store + conversion
+# ---------------------------
+EXPENSES: List[dict] = []
+
+async def convert_expense(e: ExpenseIn) -> dict:
+    """Converted expense row; raises HTTPException (422 bad input, 502 CNB unreachable)."""
+    code = e.currency.upper()
+    rate_task = get_rate_for(code, e.date)
+    cc = _country_code(e.country)
+    hols_task = calendarific_holidays(cc, e.date) if cc else asyncio.sleep(0, [])
+    try:
+        (per_unit, rate_date), hols = await asyncio.gather(rate_task, hols_task)
+    except UnknownCurrency:
+        raise HTTPException(status_code=422, detail=f"Unknown currency {code} (not in CNB TXT feed).")
+    if per_unit is None:
+        raise HTTPException(status_code=502, detail=f"Could not fetch exchange rate (CNB TXT) for {code}.")
+    converted = round(e.amount * per_unit, 2)
+    if not math.isfinite(converted):
+        raise HTTPException(status_code=422, detail=f"Amount {e.amount} {code} is out of range.")
+    return {
+        "date": e.date.isoformat(), "country": e.country, "currency": code, "amount": e.amount,
+        "category": e.category, "shop": e.shop, "note": e.note,
+        "converted_czk": converted, "rate_value": round(per_unit, 4), "rate_date": rate_date,
+        "holidays": [h.get("name", "") for h in hols],
+    }
+
+# ---------------------------
+# Routes
+# ---------------------------
+@app.get("/health")
+async def health():
+    return {"ok": True, "expenses": len(EXPENSES)}
+
+@app.post("/expenses", status_code=201)
+async def create_expense(expense: ExpenseIn):
+    row = await convert_expense(expense)
+    EXPENSES.append(row)
+    return row
+
+@app.post("/expenses/batch", status_code=201)
+async def create_expenses(batch: ExpenseBatchIn):
+    rows = await asyncio.gather(*(convert_expense(e) for e in batch.expenses), return_exceptions=True)
+    saved, errors = [], []
+    for i, row in enumerate(rows):
+        if isinstance(row, HTTPException):
+            errors.append({"index": i, "status": row.status_code, "detail": row.detail})
+        elif isinstance(row, Exception):
+            errors.append({"index": i, "status": 500, "detail": f"{type(row).__name__}: {row}"})
+        else:
+            saved.append(row)
+    EXPENSES.extend(saved)
+    return {"saved": saved, "errors": errors}
+
+@app.get("/expenses/summary")
+async def expenses_summary(
+    group_by: Literal["category", "currency", "month"] = "category",
+    date_from: Optional[dt_date] = Query(default=None),
+    date_to: Optional[dt_date] = Query(default=None),
+):
+    lo = date_from.isoformat() if date_from else ""
+    hi = date_to.isoformat() if date_to else "9999-12-31"
+    totals, counts = defaultdict(float), defaultdict(int)
+    for row in EXPENSES:
+        if not (lo <= row["date"] <= hi):
+            continue
+        key = row["date"][:7] if group_by == "month" else row[group_by]
+        totals[key] += row["converted_czk"]
+        counts[key] += 1
+    groups = [{"key": k, "total_czk": round(v, 2), "count": counts[k]}
+              for k, v in sorted(totals.items(), key=lambda kv: -kv[1])]
+    return {
+        "group_by": group_by,
+        "total_czk": round(sum(totals.values()), 2),
+        "count": sum(counts.values()),
+        "groups": groups,
+    }
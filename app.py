@@ -13,6 +13,11 @@ import boto3
 import streamlit as st
 from typing import Union
 
+from expense_core import (
+    cnb_txt_url, parse_rate_from_txt, header_date_iso,
+    CALENDARIFIC_URL, calendarific_params, filter_public_holidays, resolve_country_for_calendarific,
+)
+
 st.title("Ahoj z mojej výdavkovej appky 🚀")
 st.write("Ak toto vidíš, AWS beží správne!")
 
@@ -241,7 +246,7 @@ if "expenses" not in st.session_state:
 # ---------------------------
 @st.cache_data(ttl=600)
 def fetch_cnb_txt(date_str: str):
-    url = f"https://www.cnb.cz/cs/financni-trhy/devizovy-trh/kurzy-devizoveho-trhu/kurzy-devizoveho-trhu/denni_kurz.txt?date={date_str}"
+    url = cnb_txt_url(date_str)
     try:
         r = requests.get(url, timeout=10)
         if r.status_code != 200:
@@ -254,7 +259,7 @@ def fetch_cnb_txt(date_str: str):
 
 @st.cache_data(ttl=600)
 def fetch_cnb_txt_latest():
-    url = "https://www.cnb.cz/cs/financni-trhy/devizovy-trh/kurzy-devizoveho-trhu/kurzy-devizoveho-trhu/denni_kurz.txt"
+    url = cnb_txt_url()
     try:
         r = requests.get(url, timeout=10)
         if r.status_code != 200:
@@ -265,24 +270,6 @@ def fetch_cnb_txt_latest():
         _debug_set("cnb", False, f"Exception latest: {e}")
         return None
 
-def parse_rate_from_txt(txt: str, code: str):
-    if not txt:
-        return None, None, None
-    lines = txt.splitlines()
-    header_date = lines[0].split(" #")[0].strip() if lines else None
-    for line in lines[2:]:
-        parts = line.strip().split("|")
-        if len(parts) == 5:
-            _, _, qty, c_code, rate = parts
-            if c_code == code:
-                try:
-                    qty_f = float(qty.replace(",", "."))
-                    rate_f = float(rate.replace(",", "."))
-                    return rate_f, qty_f, header_date
-                except Exception:
-                    return None, None, header_date
-    return None, None, header_date
-
 def get_rate_for(code: str, d: dt_date):
     if code == "CZK":
         _debug_set("cnb", True, "CZK=1 (no fetch)")
@@ -299,10 +286,7 @@ def get_rate_for(code: str, d: dt_date):
             return None, None
         _debug_set("cnb", True, f"Used latest for {code}")
     else:
-        try:
-            rate_date_iso = datetime.strptime(header_date, "%d.%m.%Y").date().isoformat()
-        except Exception:
-            rate_date_iso = d.isoformat()
+        rate_date_iso = header_date_iso(header_date, d)
         _debug_set("cnb", True, f"Used daily for {code}")
     return rate/qty, rate_date_iso
 
@@ -320,26 +304,13 @@ def calendarific_holidays(api_key: str, country_code: str, year: int, month: int
         _debug_set("calendarific", None, "No API key (ENV/session)")
         return []
 
-    url = (
-        "https://calendarific.com/api/v2/holidays"
-        f"?api_key={api_key}&country={country_code}&year={year}&month={month}&day={day}"
-    )
-
     try:
-        r = requests.get(url, timeout=10)
+        r = requests.get(CALENDARIFIC_URL, params=calendarific_params(api_key, country_code, year, month, day), timeout=10)
         if r.status_code != 200:
             _debug_set("calendarific", False, f"HTTP {r.status_code}")
             return []
 
-        data = r.json()
-        hols = data.get("response", {}).get("holidays", [])
-
-        # Filter out commemorative and observance days – keep only real public/national holidays
-        hols = [
-            h for h in hols
-            if any(t.lower() in ["public holiday", "national holiday"] for t in h.get("type", []))
-            and "černová" not in h.get("name", "").lower()
-        ]
+        hols = filter_public_holidays(r.json())
 
         _debug_set("calendarific", True, f"{len(hols)} holiday(s)")
         return hols
@@ -348,13 +319,6 @@ def calendarific_holidays(api_key: str, country_code: str, year: int, month: int
         _debug_set("calendarific", False, f"Exception: {e}")
         return []
 
-def resolve_country_for_calendarific(country_label: str):
-    if "Česko" in country_label or "Czech" in country_label:
-        return "CZ"
-    if "Slovensko" in country_label or "Slovakia" in country_label:
-        return "SK"
-    return "CZ"
-
 # ---------------------------
 # IssueCoin – seasonal & fun messages (RAG-like static logic)
 # ---------------------------
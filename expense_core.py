@@ -0,0 +1,76 @@
+# expense_core.py — shared CNB TXT + Calendarific logic (no Streamlit), used by app.py and api.py
+
+from datetime import datetime, date as dt_date
+from typing import Union
+
+CNB_TXT_URL = "https://www.cnb.cz/cs/financni-trhy/devizovy-trh/kurzy-devizoveho-trhu/kurzy-devizoveho-trhu/denni_kurz.txt"
+CALENDARIFIC_URL = "https://calendarific.com/api/v2/holidays"
+
+# ---------------------------
+# CNB TXT feed helpers
+# ---------------------------
+def cnb_txt_url(date_str: Union[str, None] = None) -> str:
+    """Daily CNB TXT feed URL; without `date_str` (dd.mm.YYYY) the latest feed."""
+    return f"{CNB_TXT_URL}?date={date_str}" if date_str else CNB_TXT_URL
+
+def parse_rate_from_txt(txt: str, code: str):
+    if not txt:
+        return None, None, None
+    lines = txt.splitlines()
+    header_date = lines[0].split(" #")[0].strip() if lines else None
+    for line in lines[2:]:
+        parts = line.strip().split("|")
+        if len(parts) == 5:
+            _, _, qty, c_code, rate = parts
+            if c_code == code:
+                try:
+                    qty_f = float(qty.replace(",", "."))
+                    rate_f = float(rate.replace(",", "."))
+                    return rate_f, qty_f, header_date
+                except Exception:
+                    return None, None, header_date
+    return None, None, header_date
+
+def cnb_feed_ok(txt: Union[str, None]) -> bool:
+    """True when `txt` looks like a real CNB TXT feed: dated header line + at least one rate row."""
+    if not txt:
+        return False
+    lines = txt.splitlines()
+    try:
+        datetime.strptime(lines[0].split(" #")[0].strip(), "%d.%m.%Y")
+    except Exception:
+        return False
+    return any(len(line.strip().split("|")) == 5 for line in lines[2:])
+
+def header_date_iso(header_date: Union[str, None], fallback: dt_date) -> str:
+    try:
+        return datetime.strptime(header_date, "%d.%m.%Y").date().isoformat()
+    except Exception:
+        return fallback.isoformat()
+
+# ---------------------------
+# Calendarific helpers
+# ---------------------------
+def calendarific_params(api_key: str, country_code: str, year: int, month: int, day: int) -> dict:
+    return {"api_key": api_key, "country": country_code, "year": year, "month": month, "day": day}
+
+def filter_public_holidays(data: dict) -> list:
+    # Calendarific error bodies can carry e.g. {"response": []} – treat anything unexpected as "no holidays"
+    resp = data.get("response") if isinstance(data, dict) else None
+    hols = resp.get("holidays") if isinstance(resp, dict) else None
+    if not isinstance(hols, list):
+        return []
+    # Filter out commemorative and observance days – keep only real public/national holidays
+    return [
+        h for h in hols
+        if isinstance(h, dict)
+        and any(str(t).lower() in ["public holiday", "national holiday"] for t in (h.get("type") or []))
+        and "černová" not in str(h.get("name") or "").lower()
+    ]
+
+def resolve_country_for_calendarific(country_label: str):
+    if "Česko" in country_label or "Czech" in country_label:
+        return "CZ"
+    if "Slovensko" in country_label or "Slovakia" in country_label:
+        return "SK"
+    return "CZ"
@@ -0,0 +1,241 @@
+# test_api.py — api.py endpoints, TTL cache and expense_core helpers (CNB/Calendarific mocked via httpx.MockTransport)
+
+import asyncio
+from datetime import date as dt_date
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+from expense_core import cnb_feed_ok, filter_public_holidays, parse_rate_from_txt
+
+CNB_TXT = (
+    "02.01.2025 #1\n"
+    "země|měna|množství|kód|kurz\n"
+    "EMU|euro|1|EUR|25,000\n"
+    "Japonsko|jen|100|JPY|15,000\n"
+)
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.delenv("CALENDARIFIC_API_KEY", raising=False)
+    api.EXPENSES.clear()
+    api._cnb_cache._items.clear()
+    api._holiday_cache._items.clear()
+    with TestClient(api.app) as c:
+        yield c
+    api.EXPENSES.clear()
+
+def mock_upstream(c, handler):
+    """Swap the pooled client for a MockTransport one; returns the list of requested URLs."""
+    calls = []
+
+    def _handler(request):
+        calls.append(str(request.url))
+        return handler(request)
+
+    c.portal.call(api.app.state.http.aclose)
+    api.app.state.http = httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+    return calls
+
+def cnb_ok(request):
+    return httpx.Response(200, text=CNB_TXT)
+
+# ---------------------------
+# expense_core
+# ---------------------------
+def test_parse_rate_from_txt():
+    assert parse_rate_from_txt(CNB_TXT, "JPY") == (15.0, 100.0, "02.01.2025")
+    assert parse_rate_from_txt(CNB_TXT, "XXX") == (None, None, "02.01.2025")
+    assert parse_rate_from_txt("", "EUR") == (None, None, None)
+
+def test_cnb_feed_ok():
+    assert cnb_feed_ok(CNB_TXT)
+    assert not cnb_feed_ok("")
+    assert not cnb_feed_ok("<html>maintenance</html>")
+    assert not cnb_feed_ok("02.01.2025 #1\nzemě|měna|množství|kód|kurz\n")
+
+def test_filter_public_holidays_tolerates_bad_payloads():
+    assert filter_public_holidays({"response": []}) == []
+    assert filter_public_holidays({"response": {"holidays": None}}) == []
+    assert filter_public_holidays([]) == []
+    hols = [{"name": "New Year", "type": None}, {"name": "Restoration Day", "type": ["National holiday"]}]
+    assert filter_public_holidays({"response": {"holidays": hols}}) == hols[1:]
+
+# ---------------------------
+# Endpoints
+# ---------------------------
+def test_single_post_converts_and_stores(client):
+    mock_upstream(client, cnb_ok)
+    r = client.post("/expenses", json={"date": "2025-01-02", "amount": 10, "currency": "eur", "category": "Food"})
+    assert r.status_code == 201
+    row = r.json()
+    assert (row["currency"], row["converted_czk"], row["rate_value"], row["rate_date"]) == ("EUR", 250.0, 25.0, "2025-01-02")
+    assert client.get("/health").json()["expenses"] == 1
+
+def test_batch_partial_failure(client):
+    mock_upstream(client, cnb_ok)
+    r = client.post("/expenses/batch", json={"expenses": [
+        {"date": "2025-01-02", "amount": 200, "currency": "JPY"},
+        {"date": "2025-01-02", "amount": 5, "currency": "XXX"},
+        {"date": "2025-01-02", "amount": 50},
+    ]})
+    assert r.status_code == 201
+    body = r.json()
+    assert [row["converted_czk"] for row in body["saved"]] == [30.0, 50.0]
+    assert body["errors"] == [{"index": 1, "status": 422, "detail": "Unknown currency XXX (not in CNB TXT feed)."}]
+    assert len(api.EXPENSES) == 2
+
+def test_summary_grouping_and_date_filter(client):
+    mock_upstream(client, cnb_ok)
+    client.post("/expenses/batch", json={"expenses": [
+        {"date": "2025-01-02", "amount": 10, "currency": "EUR", "category": "Food"},
+        {"date": "2025-01-20", "amount": 100, "category": "Food"},
+        {"date": "2025-02-03", "amount": 40, "category": "Fun"},
+    ]})
+    by_cat = client.get("/expenses/summary").json()
+    assert (by_cat["total_czk"], by_cat["count"]) == (390.0, 3)
+    assert by_cat["groups"] == [{"key": "Food", "total_czk": 350.0, "count": 2}, {"key": "Fun", "total_czk": 40.0, "count": 1}]
+    by_month = client.get("/expenses/summary", params={"group_by": "month", "date_from": "2025-01-10"}).json()
+    assert by_month["groups"] == [{"key": "2025-01", "total_czk": 100.0, "count": 1}, {"key": "2025-02", "total_czk": 40.0, "count": 1}]
+    assert client.get("/expenses/summary", params={"group_by": "shop"}).status_code == 422
+
+def test_batch_shares_one_cnb_fetch(client):
+    calls = mock_upstream(client, cnb_ok)
+    r = client.post("/expenses/batch", json={"expenses": [{"date": "2025-01-02", "amount": i, "currency": "EUR"} for i in range(20)]})
+    assert len(r.json()["saved"]) == 20
+    client.post("/expenses", json={"date": "2025-01-02", "amount": 1, "currency": "JPY"})
+    assert len(calls) == 1
+
+# ---------------------------
+# Failure paths
+# ---------------------------
+@pytest.mark.parametrize("amount", [1e308, "Infinity", -1])
+def test_out_of_range_amount_rejected(client, amount):
+    mock_upstream(client, cnb_ok)
+    content = '{"date": "2025-01-02", "amount": %s, "currency": "EUR"}' % amount
+    r = client.post("/expenses", content=content, headers={"content-type": "application/json"})
+    assert r.status_code == 422
+    assert api.EXPENSES == []
+    assert client.get("/expenses/summary").status_code == 200
+
+def test_unknown_currency_is_422_without_latest_fetch(client):
+    calls = mock_upstream(client, cnb_ok)
+    r = client.post("/expenses", json={"date": "2025-01-02", "amount": 1, "currency": "XXX"})
+    assert r.status_code == 422
+    assert len(calls) == 1
+
+def test_cnb_down_is_502(client):
+    calls = mock_upstream(client, lambda request: httpx.Response(503))
+    r = client.post("/expenses", json={"date": "2025-01-02", "amount": 1, "currency": "EUR"})
+    assert r.status_code == 502
+    assert len(calls) == 1  # past date: no fallback to the latest feed
+    assert api.EXPENSES == []
+
+def test_past_date_does_not_fall_back_to_latest_feed(client):
+    calls = mock_upstream(client, lambda request: httpx.Response(404 if "date=" in str(request.url) else 200, text=CNB_TXT))
+    r = client.post("/expenses", json={"date": "2025-01-05", "amount": 2, "currency": "EUR"})
+    assert r.status_code == 502
+    assert len(calls) == 1
+    r = client.post("/expenses/batch", json={"expenses": [{"date": "2025-01-05", "amount": 2, "currency": "EUR"}]})
+    assert r.json()["errors"][0]["status"] == 502
+    assert api.EXPENSES == []
+
+def test_today_falls_back_to_latest_feed(client):
+    mock_upstream(client, lambda request: httpx.Response(404 if "date=" in str(request.url) else 200, text=CNB_TXT))
+    r = client.post("/expenses", json={"date": dt_date.today().isoformat(), "amount": 2, "currency": "EUR"})
+    assert r.status_code == 201
+    assert (r.json()["converted_czk"], r.json()["rate_date"]) == (50.0, "2025-01-02")
+
+@pytest.mark.parametrize("body", ["", "<html>maintenance</html>", "02.01.2025 #1\nzemě|měna|množství|kód|kurz\n"])
+def test_unparseable_feed_is_502_not_422(client, body):
+    mock_upstream(client, lambda request: httpx.Response(200, text=body))
+    r = client.post("/expenses", json={"date": "2025-01-02", "amount": 1, "currency": "EUR"})
+    assert r.status_code == 502
+
+def test_transport_error_is_502(client):
+    def handler(request):
+        raise RuntimeError("boom")
+
+    mock_upstream(client, handler)
+    r = client.post("/expenses", json={"date": "2025-01-02", "amount": 1, "currency": "EUR"})
+    assert r.status_code == 502
+
+def test_calendarific_error_body_does_not_fail_expense(client, monkeypatch):
+    monkeypatch.setenv("CALENDARIFIC_API_KEY", "k")
+
+    def handler(request):
+        if "calendarific" in request.url.host:
+            return httpx.Response(200, json={"response": []})
+        return cnb_ok(request)
+
+    mock_upstream(client, handler)
+    r = client.post("/expenses", json={"date": "2025-01-02", "amount": 1, "currency": "EUR", "country": "SK"})
+    assert r.status_code == 201
+    assert r.json()["holidays"] == []
+
+@pytest.mark.parametrize("country, expected", [("de", "DE"), ("Slovensko – EUR €", "SK"), ("Germany", None)])
+def test_holiday_country_resolution(client, monkeypatch, country, expected):
+    monkeypatch.setenv("CALENDARIFIC_API_KEY", "k")
+
+    def handler(request):
+        if "calendarific" in request.url.host:
+            return httpx.Response(200, json={"response": {"holidays": [{"name": "Holiday", "type": ["National holiday"]}]}})
+        return cnb_ok(request)
+
+    calls = mock_upstream(client, handler)
+    r = client.post("/expenses", json={"date": "2025-01-02", "amount": 1, "country": country})
+    sent = [c for c in calls if "calendarific" in c]
+    if expected:
+        assert f"country={expected}" in sent[0]
+        assert r.json()["holidays"] == ["Holiday"]
+    else:
+        assert sent == []
+        assert r.json()["holidays"] == []
+
+# ---------------------------
+# TTL cache
+# ---------------------------
+def test_ttl_cache_dedups_concurrent_misses():
+    cache, calls = api._TTLCache(ttl=60), []
+
+    async def factory():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "txt"
+
+    async def run():
+        return await asyncio.gather(*(cache.get("k", factory) for _ in range(10)))
+
+    assert asyncio.run(run()) == ["txt"] * 10
+    assert len(calls) == 1
+
+def test_ttl_cache_evicts_failures():
+    cache, results = api._TTLCache(ttl=60), [RuntimeError("boom"), None, "ok"]
+
+    async def factory():
+        r = results.pop(0)
+        if isinstance(r, Exception):
+            raise r
+        return r
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await cache.get("k", factory)
+        assert await cache.get("k", factory) is None
+        assert await cache.get("k", factory) == "ok"
+        assert await cache.get("k", factory) == "ok"
+
+    asyncio.run(run())
+    assert results == []
+
+def test_ttl_cache_respects_maxsize():
+    cache = api._TTLCache(ttl=60, maxsize=3)
+
+    async def run():
+        for k in range(5):
+            await cache.get(k, lambda k=k: asyncio.sleep(0, k))
+
+    asyncio.run(run())
+    assert list(cache._items) == [2, 3, 4]